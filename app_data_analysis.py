@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+App Data Analysis
+Analyzes the app/domain catalog: categories, domains, TLDs and Uzbekistan focus
+"""
+
+import pandas as pd
+import pyarrow.csv as pacsv
+import matplotlib.pyplot as plt
+
+
+def load_and_clean_data(filename='app_data.csv'):
+    """Load the app catalog CSV and precompute the TLD column and region masks"""
+    # Arrow parses the file multithreaded and maps empty strings to null,
+    # which also covers the old app_id '' -> NaN normalization
+    table = pacsv.read_csv(
+        filename,
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True,
+                                             null_values=['']),
+    )
+    df = table.to_pandas()
+
+    # Drop rows without a usable URL
+    df = df[df['url'].notna() & (df['url'].str.strip() != '')].copy()
+
+    # Extract the TLD in a single pass; a plain list comprehension over the
+    # raw values is faster than repeated str.extract/str.contains regex scans
+    urls = df['url'].to_numpy()
+    tlds = [u.rstrip('/').rsplit('.', 1)[-1] if isinstance(u, str) and '.' in u else ''
+            for u in urls]
+    df['tld'] = pd.Categorical(tlds)
+
+    # Cache the .uz mask once so later stages don't rescan the URL column
+    df['_is_uz'] = df['tld'].to_numpy() == 'uz'
+
+    print(f"Loaded {len(df)} app records")
+    return df
+
+
+def analyze_categories(df):
+    """Category distribution of the catalog"""
+    print("\n=== CATEGORY ANALYSIS ===")
+    category_counts = df['category'].value_counts()
+    print(f"Total categories: {len(category_counts)}")
+    for category, count in category_counts.head(10).items():
+        print(f"  {category}: {count}")
+    return category_counts
+
+
+def analyze_domains(df):
+    """Top-level domain distribution using the cached tld column"""
+    print("\n=== DOMAIN ANALYSIS ===")
+    tld_counts = df['tld'].value_counts()
+    print(f"Total distinct TLDs: {len(tld_counts)}")
+    for tld, count in tld_counts.head(10).items():
+        print(f"  .{tld}: {count}")
+    return tld_counts
+
+
+def analyze_uzbekistan_focus(df):
+    """Detail on .uz domains using the cached mask"""
+    print("\n=== UZBEKISTAN FOCUS ===")
+    uz_domains = df[df['_is_uz']]
+    print(f".uz domains: {len(uz_domains)} ({len(uz_domains) * 100.0 / len(df):.1f}% of catalog)")
+    top = uz_domains.head(10)
+    for url, app_name, category in zip(top['url'].to_numpy(),
+                                       top['app_name'].to_numpy(),
+                                       top['category'].to_numpy()):
+        print(f"  {url} - {app_name} ({category})")
+    return uz_domains
+
+
+def generate_visualizations(df, category_counts, tld_counts, save_plots=False):
+    """Bar charts for categories, TLDs and regional split"""
+    print("\n=== GENERATING VISUALIZATIONS ===")
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+
+    category_counts.head(10).plot(kind='bar', ax=axes[0], title='Top Categories')
+
+    tld_counts.head(10).plot(kind='bar', ax=axes[1], title='Top TLDs')
+
+    # Three dict lookups on the shared counts instead of summing mask columns
+    regional_data = {
+        '.uz (Uzbekistan)': int(tld_counts.get('uz', 0)),
+        '.ru (Russia)': int(tld_counts.get('ru', 0)),
+        '.com (International)': int(tld_counts.get('com', 0)),
+    }
+    regional_data['Other'] = len(df) - sum(regional_data.values())
+    axes[2].bar(range(len(regional_data)), list(regional_data.values()))
+    axes[2].set_xticks(range(len(regional_data)))
+    axes[2].set_xticklabels(list(regional_data.keys()), rotation=45, ha='right')
+    axes[2].set_title('Regional Split')
+
+    plt.tight_layout()
+    if save_plots:
+        plt.savefig('app_data_analysis.png', dpi=150)
+        print("Saved app_data_analysis.png")
+    else:
+        plt.show()
+
+
+def main():
+    """Run the full analysis pipeline"""
+    df = load_and_clean_data()
+    category_counts = analyze_categories(df)
+    tld_counts = analyze_domains(df)
+    analyze_uzbekistan_focus(df)
+    generate_visualizations(df, category_counts, tld_counts)
+
+
+if __name__ == "__main__":
+    main()
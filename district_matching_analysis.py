@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+District Matching Analysis
+Fuzzy-matches district names from the population export against the
+reference district dictionary, builds the merged dataset and derives the
+population-by-gender/age table.
+"""
+
+import os
+import pickle
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow.csv as pacsv
+from rapidfuzz import process
+from rapidfuzz.distance import JaroWinkler
+
+MAIN_CSV = 'part-00000-7eaec3f3-77ab-415c-ade1-cd47c9a52da1-c000.csv'
+REF_CSV = 'reference_district_202508071730.csv'
+
+# (source column, gender_category, age_category)
+AGE_CATEGORIES = [
+    ('Women under 18', 'female', 'under_18'),
+    ('Women 18-25', 'female', '18-25'),
+    ('Women 26-35', 'female', '26-35'),
+    ('Women 36-45', 'female', '36-45'),
+    ('Women 46-55', 'female', '46-55'),
+    ('Women 56+', 'female', '56+'),
+    ('Men under 18', 'male', 'under_18'),
+    ('Men 18-25', 'male', '18-25'),
+    ('Men 26-35', 'male', '26-35'),
+    ('Men 36-45', 'male', '36-45'),
+    ('Men 46-55', 'male', '46-55'),
+    ('Men 56+', 'male', '56+'),
+]
+
+
+# All suffixes/language tokens stripped in one pass instead of chained replaces
+_SUFFIX_RX = re.compile(
+    r'\s*(tumani|district|shahri|city|Respublikasi|Республика|Republic of'
+    r'|Ўзбекистон|Узбекистан|Uzbekistan)\s*',
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=None)
+def clean_district_name(name):
+    """Strip administrative suffixes and language tokens from a district name"""
+    return _SUFFIX_RX.sub(' ', str(name)).strip()
+
+
+def load_data():
+    """Load the population export and the reference district dictionary"""
+    main_df = pacsv.read_csv(MAIN_CSV).to_pandas()
+    ref_df = pacsv.read_csv(REF_CSV).to_pandas()
+    return main_df, ref_df
+
+
+def build_prefix_buckets(cleaned_refs):
+    """Bucket reference indices by the first three cleaned characters"""
+    buckets = defaultdict(list)
+    for idx, cleaned in enumerate(cleaned_refs):
+        buckets[cleaned[:3].lower()].append(idx)
+    return buckets
+
+
+def find_best_match(district, cleaned_refs, ref_districts, buckets, threshold=0.8):
+    """Best fuzzy match for one district against the pre-cleaned references"""
+    cleaned = clean_district_name(district)
+
+    # Fast path: only score names sharing the same cleaned prefix; fall back
+    # to the full reference list when the bucket is empty
+    candidate_idx = buckets.get(cleaned[:3].lower())
+    if candidate_idx:
+        candidates = [cleaned_refs[i] for i in candidate_idx]
+    else:
+        candidate_idx = range(len(cleaned_refs))
+        candidates = cleaned_refs
+
+    # Jaro-Winkler favors shared prefixes, which is exactly how these short
+    # district names differ, and runs in linear time per pair
+    result = process.extractOne(
+        cleaned, candidates,
+        scorer=JaroWinkler.normalized_similarity, score_cutoff=threshold,
+    )
+    if result is None:
+        return None, 0.0
+    _, score, idx = result
+    return ref_districts[candidate_idx[idx]], round(score * 100, 1)
+
+
+MATCH_CACHE = '.match_cache.pkl'
+
+
+def analyze_district_matching(main_df, ref_df):
+    """Match every district from the export against the reference dictionary"""
+    print("=== DISTRICT MATCHING ===")
+
+    # Matching is deterministic given the two input files, so reuse the last
+    # result as long as neither file changed on disk
+    sig = (os.path.getmtime(MAIN_CSV), os.path.getmtime(REF_CSV))
+    if os.path.exists(MATCH_CACHE):
+        with open(MATCH_CACHE, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('sig') == sig:
+            print(f"Loaded {len(cached['matches'])} matches from {MATCH_CACHE}")
+            return cached['matches']
+
+    main_districts = sorted(main_df['Klassifikator'].dropna().unique())
+    ref_districts = ref_df['name_uz'].dropna().tolist()
+
+    # Clean the reference names once instead of once per comparison
+    cleaned_refs = [clean_district_name(r) for r in ref_districts]
+    buckets = build_prefix_buckets(cleaned_refs)
+
+    matches = []
+    for district in main_districts:
+        best, score = find_best_match(district, cleaned_refs, ref_districts, buckets)
+        if best:
+            matches.append({
+                'main_district': district,
+                'reference_district': best,
+                'score': score,
+            })
+
+    matched_main = {m['main_district'] for m in matches}
+    matched_ref_districts = {m['reference_district'] for m in matches}
+    unmatched_main = [d for d in main_districts if d not in matched_main]
+    unmatched_ref = [d for d in ref_districts if d not in matched_ref_districts]
+
+    print(f"Main districts: {len(main_districts)}")
+    print(f"Reference districts: {len(ref_districts)}")
+    print(f"Matched: {len(matches)}")
+    print(f"Unmatched main: {len(unmatched_main)}")
+    print(f"Unmatched reference: {len(unmatched_ref)}")
+    for district in unmatched_main[:10]:
+        print(f"  no match: {district}")
+
+    with open(MATCH_CACHE, 'wb') as f:
+        pickle.dump({'sig': sig, 'matches': matches}, f)
+
+    return matches
+
+
+def create_merged_dataset(main_df, ref_df, matches):
+    """Attach reference district attributes to the population export"""
+    print("\n=== CREATING MERGED DATASET ===")
+    mapping = {m['main_district']: m['reference_district'] for m in matches}
+    main_df['ref_name_uz'] = main_df['Klassifikator'].map(mapping)
+
+    ref_cols = ref_df.rename(columns={
+        'id': 'district_id',
+        'code': 'ref_code',
+        'name_uz': 'ref_name_uz',
+        'name_ru': 'ref_name_ru',
+        'name_en': 'ref_name_en',
+        'region_id': 'ref_region_id',
+    })
+    merged = main_df.merge(ref_cols, on='ref_name_uz', how='left')
+    merged.to_csv('merged_district_data.csv', index=False)
+
+    rows_with_ref = merged['district_id'].notna().sum()
+    print(f"Merged rows: {len(merged)} ({rows_with_ref} with reference data)")
+    return merged
+
+
+def create_population_by_gender_age_csv(input_file='merged_district_data.csv',
+                                        output_file='population_by_gender_age.csv'):
+    """Explode the 2025 gender/age columns into one row per category"""
+    print("\n=== CREATING POPULATION BY GENDER/AGE CSV ===")
+    df = pacsv.read_csv(input_file).to_pandas()
+    df = df[(df['Year'] == 2025) & df['district_id'].notna()]
+
+    # One melt turns the 12 gender/age columns into long format in C code
+    # instead of 12 Python iterations per input row
+    value_vars = [col for col, _, _ in AGE_CATEGORIES]
+    long_df = df.melt(
+        id_vars=['district_id', 'ref_region_id', 'ref_name_en'],
+        value_vars=value_vars,
+        var_name='category',
+        value_name='population_count',
+    )
+
+    long_df['population_count'] = pd.to_numeric(long_df['population_count'],
+                                                errors='coerce')
+    long_df = long_df.dropna(subset=['population_count'])
+
+    # Attach gender/age as plain array lookups: category codes index straight
+    # into two small label arrays instead of hashing every row through dicts
+    codes = pd.Categorical(long_df['category'], categories=value_vars).codes
+    gender_labels = np.array([gender for _, gender, _ in AGE_CATEGORIES])
+    age_labels = np.array([age for _, _, age in AGE_CATEGORIES])
+
+    out = pd.DataFrame({
+        'id': np.arange(1, len(long_df) + 1),
+        'district_id': long_df['district_id'].to_numpy(dtype=np.int64),
+        'region_id': long_df['ref_region_id'].to_numpy(dtype=np.int64),
+        'district_name_en': long_df['ref_name_en'].to_numpy(),
+        'gender_category': gender_labels[codes],
+        'age_category': age_labels[codes],
+        'population_count': long_df['population_count'].to_numpy(dtype=np.int64),
+    })
+    out.to_csv(output_file, index=False)
+
+    print(f"Wrote {len(out)} rows to {output_file}")
+
+
+def main():
+    """Run matching, merging and the population export"""
+    main_df, ref_df = load_data()
+    matches = analyze_district_matching(main_df, ref_df)
+    create_merged_dataset(main_df, ref_df, matches)
+    create_population_by_gender_age_csv()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Simple App Analysis
+Quick look at the app catalog: categories, domains, TLDs and duplicate URLs.
+"""
+
+import re
+from collections import Counter
+
+import pandas as pd
+
+DOMAIN_RE = re.compile(r'([^./]+\.[^./]+)/?$')
+
+
+def load_and_clean(filename='app_data.csv'):
+    """Load the catalog and normalize it in one step"""
+    df = pd.read_csv(filename, dtype=str, keep_default_na=False)
+    total = len(df)
+
+    df['url'] = df['url'].str.strip()
+    df = df[df['url'] != ''].copy()
+    df['domain'] = df['url'].str.extract(DOMAIN_RE,
+                                         expand=False).fillna(df['url'])
+    for colname in ('app_id', 'app_name', 'category'):
+        df[colname] = df[colname].str.strip().replace('', 'Unknown')
+
+    print(f"Loaded {total} rows ({len(df)} after cleaning)")
+    return df
+
+
+def analyze_categories(df):
+    """Category distribution"""
+    print("\n=== CATEGORIES ===")
+    category_counts = df['category'].value_counts()
+    for category, count in category_counts.head(10).items():
+        print(f"  {category}: {count}")
+    return category_counts
+
+
+def analyze_domains(df):
+    """Domain and TLD distribution"""
+    print("\n=== DOMAINS ===")
+    domain_counts = df['domain'].value_counts()
+    for domain, count in domain_counts.head(10).items():
+        print(f"  {domain}: {count}")
+
+    print("\n=== TLDS ===")
+    # Aggregate over the unique domains already counted above rather than
+    # rescanning the whole column; rpartition avoids a list per domain
+    tld_counts = Counter()
+    for domain, count in domain_counts.items():
+        if '.' in domain:
+            tld_counts[domain.rpartition('.')[2]] += count
+    for tld, count in tld_counts.most_common(10):
+        print(f"  .{tld}: {count}")
+    return domain_counts, tld_counts
+
+
+def find_duplicates(df):
+    """Report URLs that appear more than once"""
+    print("\n=== DUPLICATE URLS ===")
+    url_counts = df['url'].value_counts()
+    dupes = url_counts[url_counts > 1]
+    # One grouped pass collects the app names per URL; the loop below then
+    # looks each duplicate up in O(1) instead of rescanning the frame
+    url_to_apps = df.groupby('url')['app_name'].agg(set)
+    for url, count in dupes.head(10).items():
+        print(f"  {url} x{count}: {', '.join(sorted(url_to_apps[url]))}")
+    print(f"Total duplicated URLs: {len(dupes)}")
+    return dupes
+
+
+def main():
+    """Run the full catalog analysis"""
+    df = load_and_clean()
+    analyze_categories(df)
+    analyze_domains(df)
+    find_duplicates(df)
+
+
+if __name__ == "__main__":
+    main()
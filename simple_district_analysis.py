@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Simple District Analysis
+Standard-library variant of the district matching: matches the population
+export districts against the reference dictionary and writes the merged CSV.
+"""
+
+import csv
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    from rapidfuzz import process, fuzz
+    HAVE_RAPIDFUZZ = True
+except ImportError:
+    HAVE_RAPIDFUZZ = False
+
+MAIN_CSV = 'part-00000-7eaec3f3-77ab-415c-ade1-cd47c9a52da1-c000.csv'
+REF_CSV = 'reference_district_202508071730.csv'
+
+
+def load_csv_data(filename):
+    """Load a CSV into a header list and a list of row lists"""
+    with open(filename, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        rows = list(reader)
+    return headers, rows
+
+
+# One compiled alternation instead of eight chained str.replace passes
+_SUFFIX_RE = re.compile(
+    r'\s+(tumani|district|shahri|city|Respublikasi|Республика|Republic of'
+    r'|Ўзбекистон|Узбекистан|Uzbekistan)\b',
+    re.IGNORECASE,
+)
+
+
+def clean_district_name(name):
+    """Strip administrative suffixes and language tokens from a district name"""
+    return _SUFFIX_RE.sub('', str(name)).strip()
+
+
+def find_best_match(district, cleaned_refs, ref_districts, threshold=70):
+    """Best fuzzy match for one district name against pre-cleaned references"""
+    cleaned_name = clean_district_name(district).lower()
+
+    if HAVE_RAPIDFUZZ:
+        result = process.extractOne(cleaned_name, cleaned_refs,
+                                    scorer=fuzz.ratio, score_cutoff=threshold)
+        if result is None:
+            return None, 0.0
+        _, score, idx = result
+        return ref_districts[idx], score
+
+    # Fallback when rapidfuzz is not installed: one matcher is reused so the
+    # index difflib builds for the main name survives across references, and
+    # the cheap ratio upper bounds skip hopeless candidates before ratio()
+    best_match = None
+    best_score = 0.0
+    sm = SequenceMatcher(autojunk=False)
+    sm.set_seq2(cleaned_name)
+    for idx, cleaned_ref in enumerate(cleaned_refs):
+        sm.set_seq1(cleaned_ref)
+        if sm.real_quick_ratio() * 100 <= best_score:
+            continue
+        if sm.quick_ratio() * 100 <= best_score:
+            continue
+        score = sm.ratio() * 100
+        if score > best_score:
+            best_match = ref_districts[idx]
+            best_score = score
+    if best_score >= threshold:
+        return best_match, best_score
+    return None, 0.0
+
+
+def build_lookups(main_headers, main_data, ref_headers, ref_data):
+    """Clean every district name once, for use by matching and merging alike"""
+    main_klassifikator_idx = main_headers.index('Klassifikator')
+    ref_name_uz_idx = ref_headers.index('name_uz')
+
+    # Counting while deduplicating is free with Counter
+    district_counts = Counter(row[main_klassifikator_idx] for row in main_data)
+    main_clean_map = {d: clean_district_name(d).lower() for d in district_counts}
+
+    ref_districts = [row[ref_name_uz_idx] for row in ref_data]
+    ref_clean_map = {r: clean_district_name(r).lower() for r in ref_districts}
+
+    return district_counts, main_clean_map, ref_districts, ref_clean_map
+
+
+def analyze_district_matching(lookups):
+    """Match every district from the export against the reference dictionary"""
+    print("=== DISTRICT MATCHING ===")
+    district_counts, main_clean_map, ref_districts, ref_clean_map = lookups
+
+    # Matching the frequent districts first keeps the hot lookups early
+    main_districts = sorted(district_counts, key=district_counts.get,
+                            reverse=True)
+
+    # Built positionally from ref_districts so indices returned by the fuzzy
+    # scorers stay aligned even if the reference CSV repeats a name
+    cleaned_refs = [ref_clean_map[r] for r in ref_districts]
+    # Districts that match exactly after cleaning resolve via one dict lookup
+    exact_map = {cleaned: ref for ref, cleaned in ref_clean_map.items()}
+
+    matches = []
+    fuzzy_districts = []
+    for district in main_districts:
+        exact_hit = exact_map.get(main_clean_map[district])
+        if exact_hit:
+            matches.append({
+                'main_district': district,
+                'reference_district': exact_hit,
+                'score': 100.0,
+            })
+        else:
+            fuzzy_districts.append(district)
+
+    if HAVE_RAPIDFUZZ and fuzzy_districts:
+        # One C call scores every remaining (district, reference) pair across
+        # all cores; Python only argmaxes the resulting rows
+        cleaned_mains = [main_clean_map[d] for d in fuzzy_districts]
+        scores = process.cdist(cleaned_mains, cleaned_refs,
+                               scorer=fuzz.ratio, workers=-1)
+        for i, district in enumerate(fuzzy_districts):
+            idx = int(scores[i].argmax())
+            score = float(scores[i][idx])
+            if score >= 70:
+                matches.append({
+                    'main_district': district,
+                    'reference_district': ref_districts[idx],
+                    'score': score,
+                })
+    else:
+        for district in fuzzy_districts:
+            best, score = find_best_match(district, cleaned_refs, ref_districts)
+            if best:
+                matches.append({
+                    'main_district': district,
+                    'reference_district': best,
+                    'score': score,
+                })
+
+    print(f"Main districts: {len(district_counts)}")
+    print(f"Reference districts: {len(ref_districts)}")
+    print(f"Matched: {len(matches)}")
+    return matches
+
+
+def create_merged_dataset(main_headers, main_data, ref_headers, ref_data, matches):
+    """Write merged_district_data.csv with reference attributes attached"""
+    print("\n=== CREATING MERGED DATASET ===")
+    main_klassifikator_idx = main_headers.index('Klassifikator')
+    ref_name_uz_idx = ref_headers.index('name_uz')
+    ref_name_en_idx = ref_headers.index('name_en')
+    ref_name_ru_idx = ref_headers.index('name_ru')
+    ref_code_idx = ref_headers.index('code')
+    ref_region_id_idx = ref_headers.index('region_id')
+
+    match_map = {m['main_district']: m['reference_district'] for m in matches}
+    # One tuple per reference row; the merge loop unpacks positionally instead
+    # of hashing four keys through a dict per lookup
+    ref_lookup = {
+        row[ref_name_uz_idx]: (row[ref_name_en_idx], row[ref_name_ru_idx],
+                               row[ref_code_idx], row[ref_region_id_idx])
+        for row in ref_data
+    }
+
+    new_headers = main_headers + ['ref_district', 'ref_name_en', 'ref_name_ru',
+                                  'ref_code', 'ref_region_id']
+    # Rows stream straight to the writer; the full merged list never sits in
+    # memory and the with-reference count is kept while writing
+    rows_with_ref = 0
+    with open('merged_district_data.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(new_headers)
+        for row in main_data:
+            ref_district = match_map.get(row[main_klassifikator_idx])
+            if ref_district:
+                name_en, name_ru, code, region_id = ref_lookup[ref_district]
+                writer.writerow(row + [ref_district, name_en, name_ru, code,
+                                       region_id])
+                rows_with_ref += 1
+            else:
+                writer.writerow(row + ['', '', '', '', ''])
+
+    print(f"Merged rows: {len(main_data)} ({rows_with_ref} with reference data)")
+
+
+if __name__ == "__main__":
+    main_headers, main_data = load_csv_data(MAIN_CSV)
+    ref_headers, ref_data = load_csv_data(REF_CSV)
+    lookups = build_lookups(main_headers, main_data, ref_headers, ref_data)
+    matches = analyze_district_matching(lookups)
+    create_merged_dataset(main_headers, main_data, ref_headers, ref_data,
+                          matches)